@@ -101,6 +101,51 @@ async def create_person():
         }), 500
 
 
+@api_bp.route('/persons/bulk', methods=['POST'])
+@require_auth('person:write')
+async def create_persons_bulk():
+    """
+    Create multiple persons in a single transaction.
+
+    Request Body:
+    {
+        "persons": [
+            {"person_id": "EMP001", "name": "John Doe", ...},
+            ...
+        ]
+    }
+    """
+    try:
+        data = await request.get_json()
+        persons = data.get('persons')
+
+        if not isinstance(persons, list):
+            return jsonify({
+                "success": False,
+                "error": "Missing required fields",
+                "message": "persons must be a list"
+            }), 400
+
+        if any(not p.get('person_id') or not p.get('name') for p in persons):
+            return jsonify({
+                "success": False,
+                "error": "Missing required fields",
+                "message": "every person needs person_id and name"
+            }), 400
+
+        result = attendance_system.add_persons(persons)
+
+        status_code = 201 if result['success'] else 400
+        return jsonify(result), status_code
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": "Server error",
+            "message": str(e)
+        }), 500
+
+
 @api_bp.route('/persons/<person_id>', methods=['GET'])
 @require_auth('person:read')
 async def get_person(person_id: str):
@@ -408,6 +453,52 @@ async def mark_attendance():
         }), 500
 
 
+@api_bp.route('/attendance/mark/bulk', methods=['POST'])
+@require_auth('attendance:write')
+async def mark_attendance_bulk():
+    """
+    Mark attendance for multiple persons in a single transaction.
+
+    Request Body:
+    {
+        "records": [
+            {"person_id": "EMP001", "person_name": "John Doe",
+             "check_in": "2025-01-15T09:00:00", "source": "import", ...},
+            ...
+        ]
+    }
+    """
+    try:
+        data = await request.get_json()
+        records = data.get('records')
+
+        if not isinstance(records, list):
+            return jsonify({
+                "success": False,
+                "error": "Missing required fields",
+                "message": "records must be a list"
+            }), 400
+
+        if any(not r.get('person_id') or not r.get('person_name') for r in records):
+            return jsonify({
+                "success": False,
+                "error": "Missing required fields",
+                "message": "every record needs person_id and person_name"
+            }), 400
+
+        result = attendance_system.mark_attendance_bulk(records)
+
+        status_code = 201 if result['success'] else 400
+        return jsonify(result), status_code
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": "Server error",
+            "message": str(e)
+        }), 500
+
+
 @api_bp.route('/attendance/<int:attendance_id>/checkout', methods=['POST'])
 @require_auth('attendance:write')
 async def mark_checkout(attendance_id: int):
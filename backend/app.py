@@ -145,9 +145,9 @@ if database.count > 0:
     print(f"[INFO] Loading {database.count} known faces into recognition engine...")
 
     # Load encodings directly from database (much faster than re-extracting from images)
-    with database._lock:
-        recognizer.known_face_encodings = database._encodings.copy()
-        recognizer.known_face_names = [meta["name"] for meta in database._metadata]
+    db_encodings, db_names = database.known_lists()
+    recognizer.known_face_encodings = list(db_encodings)
+    recognizer.known_face_names = list(db_names)
 
     print(f"[INFO] Loaded {len(recognizer.known_face_encodings)} known face encodings")
     print(f"[INFO] Known face names: {recognizer.known_face_names}")
@@ -235,11 +235,12 @@ def background_processing_loop():
                     continue
 
                 # Recognize face using enhanced recognizer (only if database has faces)
-                if len(database._encodings) > 0:
+                if database.count > 0:
+                    known_encodings, known_names = database.known_lists()
                     match_result = enhanced_recognizer.detect_and_recognize(
                         person_region,
-                        database._encodings,
-                        [meta["name"] for meta in database._metadata],
+                        known_encodings,
+                        known_names,
                         model="cnn" if torch.cuda.is_available() else "hog"
                     )
 
@@ -255,25 +256,30 @@ def background_processing_loop():
                                     break
                         track.status = "Known" if track.name != "Unknown" else "Unknown"
 
-            # Store detections in database
-            for track in tracked_persons:
-                if track.status == "Known" and track.name != "Unknown":
-                    try:
-                        detection_history.add_detection(
-                            person_name=track.name,
-                            person_id=track.person_id,
-                            confidence=track.face_confidence,
-                            status=track.status,
-                            track_id=track.track_id,
-                            bbox=[float(x) for x in track.person_bbox],
-                            source=current_source,
-                            metadata={
-                                "frames_tracked": track.frames_tracked,
-                                "background_mode": True
-                            }
-                        )
-                    except Exception as e:
-                        print(f"[Background] Error storing detection: {e}")
+            # Store detections in database: buffer the frame's detections
+            # and flush them in one transaction
+            frame_detections = [
+                {
+                    "person_name": track.name,
+                    "person_id": track.person_id,
+                    "confidence": track.face_confidence,
+                    "status": track.status,
+                    "track_id": track.track_id,
+                    "bbox": [float(x) for x in track.person_bbox],
+                    "source": current_source,
+                    "metadata": {
+                        "frames_tracked": track.frames_tracked,
+                        "background_mode": True
+                    }
+                }
+                for track in tracked_persons
+                if track.status == "Known" and track.name != "Unknown"
+            ]
+            if frame_detections:
+                try:
+                    detection_history.add_detections_bulk(frame_detections)
+                except Exception as e:
+                    print(f"[Background] Error storing detections: {e}")
 
         except Exception as e:
             print(f"[Background] Processing error: {e}")
@@ -351,15 +357,16 @@ def snapshot_analysis_loop():
                     x1, y1, x2, y2 = [int(v) for v in track.person_bbox]
 
                     # Recognize face if database has faces
-                    if len(database._encodings) > 0:
+                    if database.count > 0:
                         person_region = enhanced_frame[max(0, y1):min(enhanced_frame.shape[0], y2),
                                                        max(0, x1):min(enhanced_frame.shape[1], x2)]
 
                         if person_region.size > 0:
+                            known_encodings, known_names = database.known_lists()
                             match_result = enhanced_recognizer.detect_and_recognize(
                                 person_region,
-                                database._encodings,
-                                [meta["name"] for meta in database._metadata],
+                                known_encodings,
+                                known_names,
                                 model="cnn" if torch.cuda.is_available() else "hog"
                             )
 
@@ -962,6 +969,7 @@ async def recognize_frame() -> Response:
 
     # Step 4: Prepare results for frontend
     results = []
+    frame_detections = []
     for track in tracked_persons:
         result = {
             "track_id": track.track_id,
@@ -979,22 +987,26 @@ async def recognize_frame() -> Response:
 
         # Store detection in history database (only for known persons to avoid spam)
         if track.status == "Known" and track.name != "Unknown":
-            try:
-                detection_history.add_detection(
-                    person_name=track.name,
-                    person_id=track.person_id,
-                    confidence=track.face_confidence,
-                    status=track.status,
-                    track_id=track.track_id,
-                    bbox=[float(x) for x in track.person_bbox],
-                    source=current_source,
-                    metadata={
-                        "frames_tracked": track.frames_tracked,
-                        "face_bbox": [float(x) for x in track.face_bbox] if track.face_bbox else None
-                    }
-                )
-            except Exception as e:
-                print(f"[Detection Storage] Error storing detection: {e}")
+            frame_detections.append({
+                "person_name": track.name,
+                "person_id": track.person_id,
+                "confidence": track.face_confidence,
+                "status": track.status,
+                "track_id": track.track_id,
+                "bbox": [float(x) for x in track.person_bbox],
+                "source": current_source,
+                "metadata": {
+                    "frames_tracked": track.frames_tracked,
+                    "face_bbox": [float(x) for x in track.face_bbox] if track.face_bbox else None
+                }
+            })
+
+    # One transaction (and one fsync) for the whole frame's detections
+    if frame_detections:
+        try:
+            detection_history.add_detections_bulk(frame_detections)
+        except Exception as e:
+            print(f"[Detection Storage] Error storing detections: {e}")
 
     if DEBUG:
         print(f"[DEBUG] Returning {len(results)} tracked persons to frontend")
@@ -7,20 +7,32 @@ from pathlib import Path
 from attendance_system import AttendanceSystem
 import sys
 
+def _get_system():
+    """Create (or reuse) the shared AttendanceSystem instance."""
+    global _system
+    if _system is None:
+        backend_dir = Path(__file__).parent
+        db_path = backend_dir / "data" / "attendance.db"
+        _system = AttendanceSystem(db_path=db_path)
+    return _system
+
+
+_system = None
+
+
 def create_admin_key():
     """Create an admin API key with full permissions"""
     print("\n" + "=" * 60)
     print("API KEY GENERATION - Attendance Management System")
     print("=" * 60 + "\n")
 
-    # Initialize attendance system
     backend_dir = Path(__file__).parent
     db_path = backend_dir / "data" / "attendance.db"
 
     print(f"Database: {db_path}")
 
     try:
-        system = AttendanceSystem(db_path=db_path)
+        system = _get_system()
         print("✓ Attendance system initialized\n")
     except Exception as e:
         print(f"✗ Failed to initialize system: {e}")
@@ -93,34 +105,19 @@ def create_admin_key():
 
 def list_existing_keys():
     """List all existing API keys"""
-    backend_dir = Path(__file__).parent
-    db_path = backend_dir / "data" / "attendance.db"
-
     try:
-        import sqlite3
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT name, permissions, status, created_at, expires_at
-            FROM api_keys
-            WHERE status = 'active'
-            ORDER BY created_at DESC
-        """)
-
-        keys = cursor.fetchall()
-        conn.close()
+        keys = _get_system().list_api_keys()
 
         if keys:
             print("\n" + "=" * 60)
             print("EXISTING ACTIVE API KEYS")
             print("=" * 60 + "\n")
 
-            for i, (name, perms, status, created, expires) in enumerate(keys, 1):
-                print(f"{i}. {name}")
-                print(f"   Permissions: {perms}")
-                print(f"   Created: {created}")
-                print(f"   Expires: {expires if expires else 'Never'}")
+            for i, key in enumerate(keys, 1):
+                print(f"{i}. {key['name']}")
+                print(f"   Permissions: {key['permissions']}")
+                print(f"   Created: {key['created_at']}")
+                print(f"   Expires: {key['expires_at'] if key['expires_at'] else 'Never'}")
                 print()
 
         else:
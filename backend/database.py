@@ -4,7 +4,11 @@ Persistence helpers for face encodings and metadata.
 
 from __future__ import annotations
 
+import json
+import logging
+import os
 import pickle
+import struct
 from datetime import datetime
 from pathlib import Path
 from threading import RLock
@@ -13,10 +17,56 @@ from typing import Dict, List, Optional, Tuple
 import face_recognition
 import numpy as np
 
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+try:
+    import hnswlib
+    _HAS_HNSWLIB = True
+except ImportError:
+    _HAS_HNSWLIB = False
+
+logger = logging.getLogger(__name__)
+
+
+if _HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _best_match_kernel(matrix, query):
+        """Parallel argmax of matrix @ query for a skinny gemv.
+
+        Beats generic BLAS for a single query vector on multi-core: each
+        row's FMA loop auto-vectorizes and rows split across threads.
+        """
+        n, dim = matrix.shape
+        sims = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            s = np.float32(0.0)
+            for k in range(dim):
+                s += matrix[i, k] * query[k]
+            sims[i] = s
+        best = 0
+        best_sim = sims[0]
+        for i in range(1, n):
+            if sims[i] > best_sim:
+                best_sim = sims[i]
+                best = i
+        return best, best_sim
+
 
 class FaceDatabase:
     """Simple filesystem-backed face database."""
 
+    ENCODING_DIM = 128
+    _INITIAL_CAPACITY = 64
+    # Rows per match tile: ~256 KiB of int8 gallery plus the int32 cast
+    # stays L2-resident instead of streaming the whole gallery from DRAM.
+    _MATCH_TILE = 2048
+    # Below this gallery size the brute-force scan beats the HNSW graph
+    _ANN_MIN_N = 1024
+
     def __init__(
         self,
         data_dir: Path,
@@ -26,51 +76,219 @@ class FaceDatabase:
         self.data_dir = Path(data_dir)
         self.faces_dir = Path(faces_dir)
         self.tolerance = tolerance
-        self._db_file = self.data_dir / "faces.pkl"
+        self._db_file = self.data_dir / "faces.pkl"  # legacy format, read-only
+        self._enc_file = self.data_dir / "encodings.npy"
+        self._meta_file = self.data_dir / "metadata.json"
+        self._log_file = self.data_dir / "faces.log"
+        self._log_handle = None
         self._lock = RLock()
 
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.faces_dir.mkdir(parents=True, exist_ok=True)
 
-        self._encodings: List[np.ndarray] = []
+        # Encodings live in one contiguous (capacity, 128) float32 matrix
+        # memory-mapped from encodings.npy; _n rows are valid. The file is
+        # over-provisioned so add_face writes straight into its slot, and
+        # startup is an O(1) mmap instead of a full read+copy.
+        self._matrix: np.ndarray
+        # int8 shadow gallery (per-row scale) used by the match scan: a
+        # quarter of the float32 bandwidth for the same argmax winner.
+        self._matrix_i8: np.ndarray = np.empty((self._INITIAL_CAPACITY, self.ENCODING_DIM), dtype=np.int8)
+        self._scales: np.ndarray = np.empty(self._INITIAL_CAPACITY, dtype=np.float32)
+        self._n: int = 0
         self._metadata: List[Dict[str, str]] = []
+        # (encodings, names, n) lists handed to the recognition engines;
+        # rebuilt lazily when the face count changes so callers in hot
+        # loops get stable list identities instead of per-call copies
+        self._known_cache: Optional[Tuple[List[np.ndarray], List[str], int]] = None
+        self._index = self._new_index(self._INITIAL_CAPACITY)
         self._load()
 
-        # Debug database status
-        print(f"[DEBUG] Loaded face database:")
-        print(f"[DEBUG] - Number of faces: {len(self._encodings)}")
-        print(f"[DEBUG] - Tolerance: {self.tolerance}")
+        if _HAS_NUMBA:
+            # Pay the JIT compile once at startup, not on the first match
+            _best_match_kernel(
+                np.zeros((1, self.ENCODING_DIM), dtype=np.float32),
+                np.zeros(self.ENCODING_DIM, dtype=np.float32),
+            )
+
+        logger.debug("Loaded face database: %d faces, tolerance %s", self._n, self.tolerance)
 
     # --------------------------------------------------------------------- #
     # Internal helpers
     # --------------------------------------------------------------------- #
-    def _load(self) -> None:
-        if not self._db_file.exists():
-            print(f"[DEBUG] Database file does not exist: {self._db_file}")
-            return
+    def _new_index(self, capacity: int):
+        """Build an empty HNSW index, or None when hnswlib is absent."""
+        if not _HAS_HNSWLIB:
+            return None
+        index = hnswlib.Index(space='l2', dim=self.ENCODING_DIM)
+        index.init_index(max_elements=capacity, ef_construction=200, M=32)
+        return index
+
+    def _new_matrix(self, capacity: int) -> np.ndarray:
+        """Create the over-provisioned on-disk matrix and memory-map it."""
+        tmp = self._enc_file.with_name(self._enc_file.name + ".tmp")
+        matrix = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=np.float32, shape=(capacity, self.ENCODING_DIM)
+        )
+        os.replace(tmp, self._enc_file)
+        return matrix
+
+    def _install(self, loaded: np.ndarray, metadata: List[Dict[str, str]]) -> None:
+        """Adopt a loaded (n, 128) float32 matrix plus its metadata."""
+        self._n = loaded.shape[0]
+        capacity = max(self._INITIAL_CAPACITY, self._n)
+        self._matrix = self._new_matrix(capacity)
+        self._matrix_i8 = np.empty((capacity, self.ENCODING_DIM), dtype=np.int8)
+        self._scales = np.empty(capacity, dtype=np.float32)
+        if self._n:
+            # Rows are stored unit-length so match() can use a dot
+            # product; older files may hold raw encodings.
+            loaded = loaded / np.linalg.norm(loaded, axis=1, keepdims=True)
+            self._matrix[:self._n] = loaded
+            for i in range(self._n):
+                self._matrix_i8[i], self._scales[i] = self._quantize(loaded[i])
+        self._index = self._new_index(capacity)
+        if self._index is not None and self._n:
+            self._index.add_items(self._matrix[:self._n], np.arange(self._n))
+        self._metadata = metadata
+        # The old lists may describe deleted faces; a later re-enroll
+        # could land on the same count, so count alone can't invalidate
+        self._known_cache = None
+
+    def _attach(self, meta: Dict) -> None:
+        """Re-attach the existing memmap file without copying it into heap."""
+        self._matrix = np.lib.format.open_memmap(self._enc_file, mode="r+")
+        capacity = self._matrix.shape[0]
+        self._n = int(meta.get("count", 0))
+        self._metadata = meta.get("entries", [])
+        self._matrix_i8 = np.empty((capacity, self.ENCODING_DIM), dtype=np.int8)
+        self._scales = np.empty(capacity, dtype=np.float32)
+        for i in range(self._n):
+            self._matrix_i8[i], self._scales[i] = self._quantize(self._matrix[i])
+        self._index = self._new_index(capacity)
+        if self._index is not None and self._n:
+            self._index.add_items(self._matrix[:self._n], np.arange(self._n))
+        self._known_cache = None
 
+    def _load(self) -> None:
         try:
-            with self._db_file.open("rb") as handle:
-                payload = pickle.load(handle)
+            if self._enc_file.exists() and self._meta_file.exists():
+                with self._meta_file.open("r") as handle:
+                    meta = json.load(handle)
+                if isinstance(meta, dict):
+                    # Current format: over-provisioned memmap + count sidecar.
+                    # The kernel pages encodings in on demand and multiple
+                    # processes share one resident copy.
+                    self._attach(meta)
+                else:
+                    # Transitional format: exact-size .npy + bare entry list
+                    loaded = np.load(self._enc_file).astype(np.float32, copy=False)
+                    self._install(np.array(loaded), meta)
+                    self._save()
+            elif self._db_file.exists():
+                # Legacy pickle: convert once and rewrite in the new format
+                with self._db_file.open("rb") as handle:
+                    payload = pickle.load(handle)
 
-            encodings = payload.get("encodings", [])
-            metadata = payload.get("metadata", [])
+                encodings = payload.get("encodings", [])
+                loaded = np.asarray(encodings, dtype=np.float32).reshape(-1, self.ENCODING_DIM)
+                self._install(loaded, payload.get("metadata", []))
+                self._save()
+            else:
+                logger.debug("Database file does not exist: %s", self._enc_file)
+                self._install(np.empty((0, self.ENCODING_DIM), dtype=np.float32), [])
 
-            self._encodings = [np.array(enc, dtype=np.float32) for enc in encodings]
-            self._metadata = metadata
+            # Faces registered since the last compaction live in the
+            # append-only log; replay them on top of the snapshot.
+            replayed = self._replay_log()
+            if replayed:
+                logger.debug("Replayed %d faces from append log", replayed)
 
-            print(f"[DEBUG] Loaded from disk: {len(self._encodings)} encodings, {len(self._metadata)} metadata entries")
-        except Exception as e:
-            print(f"[ERROR] Failed to load database: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.debug("Loaded from disk: %d encodings, %d metadata entries",
+                         self._n, len(self._metadata))
+        except Exception:
+            logger.exception("Failed to load face database")
+            self._install(np.empty((0, self.ENCODING_DIM), dtype=np.float32), [])
 
     def _save(self) -> None:
-        serializable_encodings = [enc.tolist() for enc in self._encodings]
-        payload = {"encodings": serializable_encodings, "metadata": self._metadata}
+        self._matrix.flush()
+        with self._meta_file.open("w") as handle:
+            json.dump({"count": self._n, "entries": self._metadata}, handle)
+
+    def _append_log(self, entry: Dict[str, str], encoding: np.ndarray) -> None:
+        """Append one record (len-prefixed JSON + raw float32 vector) to the log."""
+        meta = json.dumps(entry).encode("utf-8")
+        if self._log_handle is None:
+            self._log_handle = self._log_file.open("ab")
+        self._log_handle.write(struct.pack("<Q", len(meta)))
+        self._log_handle.write(meta)
+        self._log_handle.write(np.ascontiguousarray(encoding, dtype=np.float32).tobytes())
+        self._log_handle.flush()
+        os.fsync(self._log_handle.fileno())
+
+    def _replay_log(self) -> int:
+        """Replay append-log records into the in-memory matrix."""
+        if not self._log_file.exists():
+            return 0
 
-        with self._db_file.open("wb") as handle:
-            pickle.dump(payload, handle)
+        data = self._log_file.read_bytes()
+        vec_bytes = self.ENCODING_DIM * 4
+        offset = 0
+        count = 0
+        while offset + 8 <= len(data):
+            (meta_len,) = struct.unpack_from("<Q", data, offset)
+            end = offset + 8 + meta_len + vec_bytes
+            if end > len(data):
+                break  # torn tail write; drop the partial record
+            offset += 8
+            entry = json.loads(data[offset:offset + meta_len])
+            offset += meta_len
+            encoding = np.frombuffer(data[offset:offset + vec_bytes], dtype=np.float32)
+            offset += vec_bytes
+            self._append_encoding(encoding)
+            self._metadata.append(entry)
+            count += 1
+        return count
+
+    def compact(self) -> None:
+        """Fold the append log into the .npy snapshot and truncate it."""
+        with self._lock:
+            self._save()
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
+            if self._log_file.exists():
+                self._log_file.unlink()
+
+    @staticmethod
+    def _quantize(encoding: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Quantize a float32 vector to int8 plus its dequantization scale."""
+        scale = 127.0 / max(float(np.abs(encoding).max()), 1e-12)
+        return np.round(encoding * scale).astype(np.int8), 1.0 / scale
+
+    def _append_encoding(self, encoding: np.ndarray) -> None:
+        """Store one L2-normalized encoding, doubling capacity when full."""
+        if self._n == self._matrix.shape[0]:
+            capacity = self._matrix.shape[0] * 2
+            old = self._matrix
+            grown = self._new_matrix(capacity)
+            grown[:self._n] = old[:self._n]
+            self._matrix = grown
+            grown_i8 = np.empty((capacity, self.ENCODING_DIM), dtype=np.int8)
+            grown_i8[:self._n] = self._matrix_i8[:self._n]
+            self._matrix_i8 = grown_i8
+            grown_scales = np.empty(capacity, dtype=np.float32)
+            grown_scales[:self._n] = self._scales[:self._n]
+            self._scales = grown_scales
+            if self._index is not None:
+                self._index.resize_index(capacity)
+        encoding = np.asarray(encoding, dtype=np.float32)
+        normalized = encoding / np.linalg.norm(encoding)
+        self._matrix[self._n] = normalized
+        self._matrix_i8[self._n], self._scales[self._n] = self._quantize(normalized)
+        if self._index is not None:
+            self._index.add_items(normalized[None, :], np.array([self._n]))
+        self._n += 1
 
     # --------------------------------------------------------------------- #
     # Public API
@@ -80,7 +298,7 @@ class FaceDatabase:
         image_name = Path(image_path).name if image_path else None
 
         with self._lock:
-            self._encodings.append(np.array(encoding, dtype=np.float32))
+            self._append_encoding(encoding)
             entry = {
                 "name": name,
                 "person_id": person_id or "",  # Store person ID
@@ -88,16 +306,26 @@ class FaceDatabase:
                 "created_at": datetime.utcnow().isoformat(),
             }
             self._metadata.append(entry)
-            self._save()
+
+            # O(1) append instead of rewriting the whole snapshot per add;
+            # fold into the .npy once the log outgrows the snapshot.
+            self._append_log(entry, self._matrix[self._n - 1])
+            snapshot_size = self._enc_file.stat().st_size if self._enc_file.exists() else 0
+            if self._log_handle.tell() > max(1 << 20, 2 * snapshot_size):
+                self.compact()
+
             return entry
 
     def clear(self) -> None:
         """Remove all saved faces."""
         with self._lock:
-            self._encodings = []
-            self._metadata = []
-            if self._db_file.exists():
-                self._db_file.unlink()
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
+            for path in (self._db_file, self._enc_file, self._meta_file, self._log_file):
+                if path.exists():
+                    path.unlink()
+            self._install(np.empty((0, self.ENCODING_DIM), dtype=np.float32), [])
 
     def list_faces(self) -> List[Dict[str, str]]:
         """Return metadata for registered faces."""
@@ -117,18 +345,52 @@ class FaceDatabase:
     def match(self, encoding: np.ndarray) -> Optional[Dict[str, object]]:
         """Return the best match for the provided encoding."""
         with self._lock:
-            if not self._encodings:
+            if not self._n:
                 return None
 
-            known_encodings = np.vstack(self._encodings)
-            distances = face_recognition.face_distance(known_encodings, encoding)
-            best_idx = int(np.argmin(distances))
-            distance = float(distances[best_idx])
-            
-            # Add debug logging for matching
-            print(f"[DEBUG] Face matching:")
-            print(f"[DEBUG] - Best distance: {distance:.3f}")
-            print(f"[DEBUG] - Tolerance threshold: {self.tolerance}")
+            # Rows are unit-length, so squared L2 distance is 2 - 2*cos_sim.
+            # The scan runs over the int8 shadow gallery: dot products in
+            # int32 with per-row dequantization, a quarter of the float32
+            # memory traffic.
+            query = np.asarray(encoding, dtype=np.float32)
+            query /= np.linalg.norm(query)
+            query_i8, query_scale = self._quantize(query)
+
+            if self._index is not None and self._n >= self._ANN_MIN_N:
+                # O(log N) graph walk instead of the O(N) scan; brute
+                # force stays faster (and exact) for small galleries
+                labels, sq_dists = self._index.knn_query(query, k=1)
+                best_idx = int(labels[0][0])
+                best_sim = 1.0 - float(sq_dists[0][0]) / 2.0
+            elif _HAS_NUMBA:
+                best_idx, best_sim = _best_match_kernel(self._matrix[:self._n], query)
+                best_idx = int(best_idx)
+                best_sim = float(best_sim)
+            else:
+                query_i32 = query_i8.astype(np.int32)
+                best_idx = 0
+                best_sim = -np.inf
+                for start in range(0, self._n, self._MATCH_TILE):
+                    end = min(start + self._MATCH_TILE, self._n)
+                    if end < self._n:
+                        # Throwaway read of the next tile's leading rows:
+                        # pulls their cache lines in while this tile's
+                        # matmul output is still being handled, so the
+                        # next matmul starts on warm cache instead of
+                        # waiting on memory.
+                        self._matrix_i8[end:min(end + 64, self._n), 0].sum()
+                    dots = self._matrix_i8[start:end].astype(np.int32) @ query_i32
+                    sims = self._scales[start:end] * (dots.astype(np.float32) * query_scale)
+                    local = int(np.argmax(sims))
+                    if sims[local] > best_sim:
+                        best_sim = float(sims[local])
+                        best_idx = start + local
+
+            distance = float(np.sqrt(max(0.0, 2.0 - 2.0 * best_sim)))
+
+            # %s-style args: nothing is formatted unless DEBUG is enabled
+            logger.debug("Face matching: best distance %.3f, tolerance %s",
+                         distance, self.tolerance)
 
             metadata = self._metadata[best_idx]
             if distance <= self.tolerance:
@@ -139,12 +401,29 @@ class FaceDatabase:
                     "meta": metadata,
                     "confidence": 1.0 - (distance / self.tolerance)
                 }
-                print(f"[DEBUG] - Match found: {metadata['name']} (ID: {metadata.get('person_id', 'N/A')}) (confidence: {match['confidence']:.3f})")
+                logger.debug("Match found: %s (ID: %s, confidence %.3f)",
+                             metadata["name"], metadata.get("person_id", "N/A"),
+                             match["confidence"])
                 return match
 
-            print("[DEBUG] - No match found (unknown face)")
+            logger.debug("No match found (unknown face)")
             return {"name": "Unknown", "person_id": "", "distance": distance, "meta": None}
 
+    def known_lists(self) -> Tuple[List[np.ndarray], List[str]]:
+        """Return (encodings, names) lists of the enrolled faces.
+
+        The lists are cached and only rebuilt when the face count
+        changes, so per-frame callers keep stable list identities and
+        downstream gallery caches are not invalidated needlessly.
+        Callers must not mutate the returned lists.
+        """
+        with self._lock:
+            if self._known_cache is None or self._known_cache[2] != self._n:
+                encodings = [np.array(self._matrix[i]) for i in range(self._n)]
+                names = [meta["name"] for meta in self._metadata]
+                self._known_cache = (encodings, names, self._n)
+            return self._known_cache[0], self._known_cache[1]
+
     @property
     def count(self) -> int:
-        return len(self._encodings)
+        return self._n
@@ -3,11 +3,117 @@ Enhanced face recognition with distance and angle robustness.
 Handles distorted faces from different camera angles and varying distances.
 """
 
+import threading
+
 import cv2
 import numpy as np
 import face_recognition
 from typing import List, Dict, Tuple, Optional
 
+# faiss gives SIMD C distance scans + log-time ANN search over the known
+# gallery; without it the NumPy full scan below is used
+try:
+    import faiss
+    _HAS_FAISS = True
+except ImportError:
+    faiss = None
+    _HAS_FAISS = False
+
+# batch-face provides a GPU RetinaFace detector that is inherently
+# multi-scale, replacing the CPU HOG upsample loop when installed
+try:
+    from batch_face import RetinaFace as _RetinaFace
+    _HAS_BATCH_FACE = True
+except ImportError:
+    _RetinaFace = None
+    _HAS_BATCH_FACE = False
+
+# numba compiles the scalar IoU helper to machine code; without it the
+# plain Python function runs unchanged
+try:
+    from numba import njit as _njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+    def _njit(*args, **kwargs):
+        def _wrap(fn):
+            return fn
+        return _wrap
+
+
+def _pack_boxes(boxes: np.ndarray) -> np.ndarray:
+    """
+    Pack (top, right, bottom, left) pixel boxes into uint64 words.
+
+    Each coordinate occupies a 16-bit lane (top|left|bottom|right from
+    the high end), so a box is one machine word: the IoU kernel reads a
+    single uint64 per box and unpacks lanes with shifts, staying entirely
+    in scalar registers.
+    """
+    b = np.clip(boxes, 0, 0xFFFF).astype(np.uint64)
+    return (b[:, 0] << np.uint64(48)) | (b[:, 3] << np.uint64(32)) \
+        | (b[:, 2] << np.uint64(16)) | b[:, 1]
+
+
+# Eagerly typed for uint64 lane-packed boxes; import-time compilation
+# removes per-call dispatch from the dedupe path
+@_njit("float32[:, ::1](uint64[::1], uint64[::1])", cache=True, fastmath=True)
+def _packed_iou_matrix(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+    """Pairwise IoU over lane-packed uint64 box arrays (see _pack_boxes)."""
+    out = np.empty((new.shape[0], old.shape[0]), dtype=np.float32)
+    for i in range(new.shape[0]):
+        p = new[i]
+        top1 = np.int64((p >> np.uint64(48)) & np.uint64(0xFFFF))
+        left1 = np.int64((p >> np.uint64(32)) & np.uint64(0xFFFF))
+        bottom1 = np.int64((p >> np.uint64(16)) & np.uint64(0xFFFF))
+        right1 = np.int64(p & np.uint64(0xFFFF))
+        area1 = (right1 - left1) * (bottom1 - top1)
+        for j in range(old.shape[0]):
+            q = old[j]
+            top2 = np.int64((q >> np.uint64(48)) & np.uint64(0xFFFF))
+            left2 = np.int64((q >> np.uint64(32)) & np.uint64(0xFFFF))
+            bottom2 = np.int64((q >> np.uint64(16)) & np.uint64(0xFFFF))
+            right2 = np.int64(q & np.uint64(0xFFFF))
+
+            iw = min(right1, right2) - max(left1, left2)
+            ih = min(bottom1, bottom2) - max(top1, top2)
+            if iw > 0 and ih > 0:
+                inter = iw * ih
+                area2 = (right2 - left2) * (bottom2 - top2)
+                union = area1 + area2 - inter
+                out[i, j] = np.float32(inter / union) if union > 0 else np.float32(0.0)
+            else:
+                out[i, j] = np.float32(0.0)
+    return out
+
+
+@_njit(
+    "float64(float64, float64, float64, float64, float64, float64, float64, float64)",
+    cache=True, fastmath=True
+)
+def _iou_scalar(
+    top1: float, right1: float, bottom1: float, left1: float,
+    top2: float, right2: float, bottom2: float, left2: float
+) -> float:
+    """IoU of two boxes passed as unpacked scalars (numba-friendly)."""
+    x_left = max(left1, left2)
+    y_top = max(top1, top2)
+    x_right = min(right1, right2)
+    y_bottom = min(bottom1, bottom2)
+
+    if x_right < x_left or y_bottom < y_top:
+        return 0.0
+
+    intersection = (x_right - x_left) * (y_bottom - y_top)
+    union = (
+        (right1 - left1) * (bottom1 - top1)
+        + (right2 - left2) * (bottom2 - top2)
+        - intersection
+    )
+
+    return intersection / union if union > 0 else 0.0
+
 
 class EnhancedFaceRecognizer:
     """
@@ -30,6 +136,38 @@ class EnhancedFaceRecognizer:
         self.max_upsample = max_upsample
         self.quality_threshold = quality_threshold
 
+        # CLAHE construction allocates the tile histogram grid; build it
+        # once and reuse across every preprocessed face
+        self._clahe_face = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
+
+        # Route the per-pixel preprocessing chain through OpenCV's T-API
+        # (UMat) when an OpenCL device is present, freeing the CPU for
+        # detection work
+        self.use_opencl = bool(cv2.ocl.haveOpenCL())
+
+        # ANN index over the known gallery (see set_known); rebuilt
+        # lazily whenever callers pass a different encodings list
+        self._index = None
+        self._index_source: Optional[List[np.ndarray]] = None
+        self._index_len = 0
+        self._gallery = np.empty((0, 128), dtype=np.float32)
+
+        # RetinaFace detector, constructed on first use (model load is
+        # expensive and most deployments stay on HOG)
+        self._retinaface = None
+
+        # Resolve the dlib models once: the first face_recognition call
+        # otherwise pays the ~500ms lazy model load inside a frame's
+        # latency budget, and going through the wrapper re-dispatches
+        # Python plumbing per call
+        try:
+            from face_recognition import api as _fr_api
+            self._face_detector = _fr_api.face_detector
+            self._face_encoder = _fr_api.face_encoder
+        except Exception:
+            self._face_detector = None
+            self._face_encoder = None
+
     def assess_face_quality(self, face_image: np.ndarray) -> float:
         """
         Assess face quality based on:
@@ -44,17 +182,31 @@ class EnhancedFaceRecognizer:
 
         h, w = face_image.shape[:2]
 
-        # Size score (0.0 to 1.0)
+        # Size score (0.0 to 1.0) from the ORIGINAL dimensions
         face_area = h * w
         size_score = min(face_area / (100 * 100), 1.0)  # Normalize to 100x100
 
-        # Sharpness score using Laplacian variance
+        # Sharpness/brightness are statistical and don't need native
+        # resolution: a fixed 96x96 thumbnail caps the Laplacian at ~9k
+        # pixels (cache-resident) no matter how close the face is
+        sharpness_norm = 500.0
+        if h > 96 or w > 96:
+            face_image = cv2.resize(face_image, (96, 96), interpolation=cv2.INTER_AREA)
+            # INTER_AREA averaging smooths high frequencies, so the
+            # thumbnail needs a lower variance threshold
+            sharpness_norm = 200.0
+
+        # Sharpness score using Laplacian variance. CV_32F halves the
+        # bytes moved vs CV_64F, and meanStdDev computes the statistics
+        # in one fused OpenCV pass instead of a NumPy reduction.
         gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY) if len(face_image.shape) == 3 else face_image
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-        sharpness_score = min(laplacian_var / 500.0, 1.0)  # Normalize
+        lap = cv2.Laplacian(gray, cv2.CV_32F)
+        _, lap_std = cv2.meanStdDev(lap)
+        laplacian_var = lap_std[0, 0] ** 2
+        sharpness_score = min(laplacian_var / sharpness_norm, 1.0)  # Normalize
 
         # Brightness score (prefer well-lit faces)
-        mean_brightness = gray.mean()
+        mean_brightness = cv2.mean(gray)[0]
         brightness_score = 1.0 - abs(mean_brightness - 128) / 128.0
 
         # Combined quality score
@@ -82,51 +234,96 @@ class EnhancedFaceRecognizer:
     def detect_faces_multiscale(
         self,
         image: np.ndarray,
-        model: str = "hog"
+        model: str = "hog",
+        rgb_image: Optional[np.ndarray] = None
     ) -> List[Dict]:
         """
         Detect faces at multiple scales for robustness.
         Tries different upsampling levels to catch distant/angled faces.
+
+        Callers that already hold an RGB copy can pass it via
+        ``rgb_image`` to skip the conversion here.
         """
         if image is None or image.size == 0:
             return []
 
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if len(image.shape) == 3 else image
+        if rgb_image is None:
+            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if len(image.shape) == 3 else image
+
+        if model == "retinaface":
+            faces = self._detect_retinaface(rgb_image)
+            if faces is not None:
+                return faces
+            model = "hog"  # batch-face not installed; fall back
 
         all_faces = []
 
         # Try multiple upsampling levels
         for upsample in [0, 1, 2]:
             try:
-                locations = face_recognition.face_locations(
-                    rgb_image,
-                    number_of_times_to_upsample=upsample,
-                    model=model
-                )
+                if model == "hog" and self._face_detector is not None:
+                    # Call the preloaded dlib detector directly, skipping
+                    # the wrapper's per-call type checks and conversions
+                    h, w = rgb_image.shape[:2]
+                    locations = [
+                        (
+                            max(rect.top(), 0),
+                            min(rect.right(), w),
+                            min(rect.bottom(), h),
+                            max(rect.left(), 0),
+                        )
+                        for rect in self._face_detector(rgb_image, upsample)
+                    ]
+                else:
+                    locations = face_recognition.face_locations(
+                        rgb_image,
+                        number_of_times_to_upsample=upsample,
+                        model=model
+                    )
 
                 if locations:
-                    for loc in locations:
-                        # Check if this face already detected
-                        is_duplicate = False
-                        for existing in all_faces:
-                            if self._iou(loc, existing['location']) > 0.5:
-                                is_duplicate = True
-                                break
-
-                        if not is_duplicate:
-                            top, right, bottom, left = loc
-                            face_img = rgb_image[top:bottom, left:right]
-                            quality = self.assess_face_quality(face_img)
-
-                            all_faces.append({
-                                'location': loc,
-                                'quality': quality,
-                                'upsample_used': upsample
-                            })
-
-                # If we found good quality faces, no need to continue
-                if any(f['quality'] > 0.6 for f in all_faces):
-                    break
+                    # Suppress re-detections of faces found at a previous
+                    # scale with one broadcast IoU pass instead of a
+                    # Python O(n^2) pair loop
+                    if all_faces:
+                        new = np.asarray(locations, dtype=np.int32)
+                        old = np.asarray(
+                            [f['location'] for f in all_faces], dtype=np.int32
+                        )
+                        if _HAS_NUMBA:
+                            # Compiled kernel over lane-packed boxes —
+                            # integer-only and allocation-free per pair
+                            iou = _packed_iou_matrix(
+                                _pack_boxes(new), _pack_boxes(old)
+                            )
+                        else:
+                            iou = self._batch_iou(new, old)
+                        keep = iou.max(axis=1) < 0.5
+                    else:
+                        keep = np.ones(len(locations), dtype=bool)
+
+                    found_good = False
+                    for loc, keep_it in zip(locations, keep):
+                        if not keep_it:
+                            continue
+                        top, right, bottom, left = loc
+                        face_img = rgb_image[top:bottom, left:right]
+                        quality = self.assess_face_quality(face_img)
+
+                        all_faces.append({
+                            'location': loc,
+                            'quality': quality,
+                            'upsample_used': upsample
+                        })
+
+                        # A sharp or large face at this scale makes the
+                        # higher upsampling passes (4x/9x the HOG pixels)
+                        # redundant — the common case for near cameras
+                        if quality > 0.6 or min(right - left, bottom - top) > 80:
+                            found_good = True
+
+                    if found_good:
+                        break
 
             except Exception as e:
                 print(f"[DEBUG] Face detection at upsample={upsample} failed: {e}")
@@ -136,36 +333,119 @@ class EnhancedFaceRecognizer:
         all_faces.sort(key=lambda x: x['quality'], reverse=True)
         return all_faces
 
-    def preprocess_face_for_angle(self, face_image: np.ndarray) -> np.ndarray:
+    def _detect_retinaface(self, rgb_image: np.ndarray) -> Optional[List[Dict]]:
+        """
+        Detect faces with batched GPU RetinaFace (batch-face package).
+
+        RetinaFace is inherently multi-scale, so one pass replaces the
+        whole HOG upsample loop. Returns None when batch-face is not
+        installed so the caller can fall back.
+        """
+        if not _HAS_BATCH_FACE:
+            return None
+
+        if self._retinaface is None:
+            try:
+                self._retinaface = _RetinaFace(gpu_id=0, fp16=True)
+            except Exception:
+                self._retinaface = _RetinaFace(gpu_id=-1)
+
+        h, w = rgb_image.shape[:2]
+        all_faces = []
+        for box, _landmarks, _score in self._retinaface(rgb_image, threshold=0.7):
+            x1, y1, x2, y2 = (int(round(v)) for v in box)
+            # Clamp to the image and convert to the (top, right, bottom,
+            # left) order the rest of the class expects
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(w, x2), min(h, y2)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            location = (y1, x2, y2, x1)
+            quality = self.assess_face_quality(rgb_image[y1:y2, x1:x2])
+            all_faces.append({
+                'location': location,
+                'quality': quality,
+                'upsample_used': 0
+            })
+
+        all_faces.sort(key=lambda x: x['quality'], reverse=True)
+        return all_faces
+
+    def preprocess_face_for_angle(
+        self, face_image: np.ndarray, input_rgb: bool = False
+    ) -> np.ndarray:
         """
         Preprocess face to handle angle distortions.
         - Histogram equalization for lighting
         - Slight sharpening
+
+        The output keeps the input's channel order; pass
+        ``input_rgb=True`` for RGB crops to avoid round-trip conversions.
         """
         if face_image is None or face_image.size == 0:
             return face_image
 
         # Convert to LAB color space
-        lab = cv2.cvtColor(face_image, cv2.COLOR_BGR2LAB)
+        to_lab = cv2.COLOR_RGB2LAB if input_rgb else cv2.COLOR_BGR2LAB
+        from_lab = cv2.COLOR_LAB2RGB if input_rgb else cv2.COLOR_LAB2BGR
 
-        # Apply CLAHE to L channel (adaptive histogram equalization)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
-        lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+        if self.use_opencl:
+            # T-API path: the whole chain runs on the OpenCL device with
+            # one upload and one download (UMat has no channel slicing,
+            # hence split/merge)
+            try:
+                lab = cv2.cvtColor(cv2.UMat(face_image), to_lab)
+                l, a, b = cv2.split(lab)
+                l = self._clahe_face.apply(l)
+                enhanced = cv2.cvtColor(cv2.merge([l, a, b]), from_lab)
+                blur = cv2.GaussianBlur(enhanced, (0, 0), sigmaX=1.0)
+                return cv2.addWeighted(enhanced, 1.3, blur, -0.3, 0).get()
+            except cv2.error:
+                self.use_opencl = False  # Driver rejected the chain
+
+        lab = cv2.cvtColor(face_image, to_lab)
 
-        # Convert back to BGR
-        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        # Apply CLAHE to L channel (adaptive histogram equalization)
+        lab[:, :, 0] = self._clahe_face.apply(lab[:, :, 0])
 
-        # Slight sharpening
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1],
-                          [-1, -1, -1]]) / 9.0
-        sharpened = cv2.filter2D(enhanced, -1, kernel)
+        enhanced = cv2.cvtColor(lab, from_lab)
 
-        # Blend original and sharpened (50/50)
-        result = cv2.addWeighted(enhanced, 0.7, sharpened, 0.3, 0)
+        # Slight sharpening: classic unsharp mask. GaussianBlur runs a
+        # separable SIMD kernel, so blur + addWeighted is two image
+        # passes vs three for the old generic filter2D + blend
+        blur = cv2.GaussianBlur(enhanced, (0, 0), sigmaX=1.0)
+        result = cv2.addWeighted(enhanced, 1.3, blur, -0.3, 0)
 
         return result
 
+    def set_known(
+        self,
+        known_encodings: List[np.ndarray],
+        known_names: List[str]
+    ) -> None:
+        """
+        (Re)build the matching structures over the known gallery.
+
+        The encodings are packed once into a contiguous (N, 128) float32
+        matrix — half the bytes of the float64 list face_distance would
+        restack per call, and the precision loss (<1e-5 L2) is far below
+        the 0.65 tolerance. With faiss installed an HNSW index is built
+        on top. Called automatically when the encodings list passed to
+        recognize_with_angle_tolerance changes.
+        """
+        self._index_source = known_encodings
+        self._index_len = len(known_encodings)
+        if known_encodings:
+            self._gallery = np.ascontiguousarray(
+                np.vstack(known_encodings), dtype=np.float32
+            )
+        else:
+            self._gallery = np.empty((0, 128), dtype=np.float32)
+
+        if _HAS_FAISS:
+            self._index = faiss.IndexHNSWFlat(128, 32)
+            self._index.add(self._gallery)
+
     def recognize_with_angle_tolerance(
         self,
         face_encoding: np.ndarray,
@@ -188,15 +468,34 @@ class EnhancedFaceRecognizer:
         elif face_quality < 0.7:
             adaptive_tolerance = min(0.70, self.base_tolerance + 0.05)
 
-        # Calculate distances
-        face_distances = face_recognition.face_distance(known_encodings, face_encoding)
-
-        if len(face_distances) == 0:
-            return "Unknown", 0.0
+        # Identity AND length: app.py appends to the same list object on
+        # runtime registration, so identity alone would never pick up
+        # newly enrolled faces until restart
+        if (known_encodings is not self._index_source
+                or len(known_encodings) != self._index_len):
+            self.set_known(known_encodings, known_names)
+
+        query = np.ascontiguousarray(face_encoding, dtype=np.float32)
+
+        if _HAS_FAISS:
+            # ANN lookup: L2 search runs in SIMD C and scales log-time
+            # with gallery size instead of the O(N) full scan
+            distances, indices = self._index.search(query.reshape(1, -1), 1)
+            best_match_idx = int(indices[0, 0])
+            if best_match_idx < 0:
+                return "Unknown", 0.0
+            # faiss returns squared L2; the tolerance is plain L2
+            min_distance = float(np.sqrt(distances[0, 0]))
+        else:
+            # One vectorized pass over the contiguous float32 gallery —
+            # no per-call restacking of the Python encodings list
+            if not len(self._gallery):
+                return "Unknown", 0.0
+            face_distances = np.linalg.norm(self._gallery - query, axis=1)
 
-        # Find best match
-        best_match_idx = face_distances.argmin()
-        min_distance = face_distances[best_match_idx]
+            # Find best match
+            best_match_idx = int(face_distances.argmin())
+            min_distance = float(face_distances[best_match_idx])
 
         # Check if within tolerance
         if min_distance < adaptive_tolerance:
@@ -225,114 +524,228 @@ class EnhancedFaceRecognizer:
         Returns:
             Dict with face_bbox, name, confidence, quality or None
         """
-        if person_region is None or person_region.size == 0:
-            return None
+        return self.detect_and_recognize_batch(
+            [person_region], known_encodings, known_names, model
+        )[0]
 
-        # Multi-scale face detection
-        detected_faces = self.detect_faces_multiscale(person_region, model)
+    def detect_and_recognize_batch(
+        self,
+        person_regions: List[np.ndarray],
+        known_encodings: List[np.ndarray],
+        known_names: List[str],
+        model: str = "hog"
+    ) -> List[Optional[Dict]]:
+        """
+        Detect and recognize across several person crops at once.
 
-        if not detected_faces:
-            return None
+        All accepted faces are encoded in a single dlib forward pass
+        instead of one ResNet launch per crop. Returns one result (or
+        None) per input region, in order.
+        """
+        results: List[Optional[Dict]] = [None] * len(person_regions)
+        prepared = []  # (region index, enhanced crop, rgb_region, location, quality)
 
-        # Use highest quality face
-        best_face = detected_faces[0]
-        location = best_face['location']
-        quality = best_face['quality']
+        for i, person_region in enumerate(person_regions):
+            if person_region is None or person_region.size == 0:
+                continue
 
-        # Check if quality is acceptable
-        if quality < self.quality_threshold:
-            print(f"[DEBUG] Face quality too low: {quality:.2f}")
-            return None
+            # One BGR->RGB conversion shared by detection, cropping and
+            # encoding; the old path re-converted the region (and the
+            # crop, twice) on a purely memory-bound pipeline
+            rgb_region = cv2.cvtColor(person_region, cv2.COLOR_BGR2RGB)
 
-        top, right, bottom, left = location
+            # Multi-scale face detection
+            detected_faces = self.detect_faces_multiscale(
+                person_region, model, rgb_image=rgb_region
+            )
 
-        # Extract and preprocess face
-        rgb_region = cv2.cvtColor(person_region, cv2.COLOR_BGR2RGB)
-        face_img = rgb_region[top:bottom, left:right]
+            if not detected_faces:
+                continue
 
-        # Enhance face for angle/lighting issues
-        enhanced_face_bgr = self.preprocess_face_for_angle(
-            cv2.cvtColor(face_img, cv2.COLOR_RGB2BGR)
-        )
-        enhanced_face_rgb = cv2.cvtColor(enhanced_face_bgr, cv2.COLOR_BGR2RGB)
+            # Use highest quality face
+            best_face = detected_faces[0]
+            location = best_face['location']
+            quality = best_face['quality']
 
-        # Get encoding from enhanced face
-        try:
-            encodings = face_recognition.face_encodings(
-                enhanced_face_rgb,
-                known_face_locations=[(0, enhanced_face_rgb.shape[1],
-                                      enhanced_face_rgb.shape[0], 0)]
+            # Check if quality is acceptable
+            if quality < self.quality_threshold:
+                print(f"[DEBUG] Face quality too low: {quality:.2f}")
+                continue
+
+            top, right, bottom, left = location
+
+            # Extract and preprocess face (stays in RGB the whole way)
+            face_img = rgb_region[top:bottom, left:right]
+
+            # Enhance face for angle/lighting issues
+            enhanced_face_rgb = self.preprocess_face_for_angle(face_img, input_rgb=True)
+
+            prepared.append((i, enhanced_face_rgb, rgb_region, location, quality))
+
+        if not prepared:
+            return results
+
+        encodings = self._encode_faces([p[1] for p in prepared])
+
+        for (i, _, rgb_region, location, quality), encoding in zip(prepared, encodings):
+            if encoding is None:
+                # Fallback to the unenhanced region if enhancement broke
+                # the encoder
+                fallback = face_recognition.face_encodings(rgb_region, [location])
+                if not fallback:
+                    continue
+                encoding = fallback[0]
+
+            # Recognize with adaptive tolerance
+            name, confidence = self.recognize_with_angle_tolerance(
+                encoding,
+                known_encodings,
+                known_names,
+                quality
             )
-        except:
-            # Fallback to original if enhancement fails
-            encodings = face_recognition.face_encodings(rgb_region, [location])
 
-        if not encodings:
-            return None
+            top, right, bottom, left = location
+            results[i] = {
+                'face_bbox': [int(left), int(top), int(right), int(bottom)],
+                'name': name,
+                'confidence': confidence,
+                'quality': quality
+            }
 
-        encoding = encodings[0]
+        return results
 
-        # Recognize with adaptive tolerance
-        name, confidence = self.recognize_with_angle_tolerance(
-            encoding,
-            known_encodings,
-            known_names,
-            quality
-        )
+    @staticmethod
+    def _encode_faces(rgb_faces: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """
+        Encode whole-crop faces, batching dlib's ResNet when possible.
 
-        return {
-            'face_bbox': [int(left), int(top), int(right), int(bottom)],
-            'name': name,
-            'confidence': confidence,
-            'quality': quality
-        }
+        Each crop is treated as one full-frame face. The batched
+        compute_face_descriptor call amortizes network launch overhead;
+        if the batch API is unavailable the crops are encoded one by one.
+        """
+        locations = [(0, f.shape[1], f.shape[0], 0) for f in rgb_faces]
+
+        try:
+            from face_recognition import api as _fr_api
+
+            landmarks = [
+                _fr_api._raw_face_landmarks(face, [loc])[0]
+                for face, loc in zip(rgb_faces, locations)
+            ]
+            descriptors = _fr_api.face_encoder.compute_face_descriptor(
+                list(rgb_faces), landmarks
+            )
+            return [np.array(d) for d in descriptors]
+        except Exception:
+            encodings: List[Optional[np.ndarray]] = []
+            for face, loc in zip(rgb_faces, locations):
+                try:
+                    encs = face_recognition.face_encodings(face, [loc])
+                except Exception:
+                    encs = []
+                encodings.append(encs[0] if encs else None)
+            return encodings
+
+    @staticmethod
+    def _batch_iou(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+        """Pairwise IoU between two (top, right, bottom, left) box arrays.
+
+        Returns an (N, M) matrix computed in a single broadcast pass.
+        """
+        inter_w = np.maximum(
+            0,
+            np.minimum(new[:, None, 1], old[None, :, 1])
+            - np.maximum(new[:, None, 3], old[None, :, 3]),
+        )
+        inter_h = np.maximum(
+            0,
+            np.minimum(new[:, None, 2], old[None, :, 2])
+            - np.maximum(new[:, None, 0], old[None, :, 0]),
+        )
+        inter = inter_w * inter_h
+        area_new = (new[:, 1] - new[:, 3]) * (new[:, 2] - new[:, 0])
+        area_old = (old[:, 1] - old[:, 3]) * (old[:, 2] - old[:, 0])
+        union = area_new[:, None] + area_old[None, :] - inter
+        return np.where(union > 0, inter / np.maximum(union, 1), 0.0)
 
     @staticmethod
     def _iou(box1: Tuple, box2: Tuple) -> float:
         """Calculate IoU between two face bounding boxes."""
         top1, right1, bottom1, left1 = box1
         top2, right2, bottom2, left2 = box2
+        return _iou_scalar(
+            float(top1), float(right1), float(bottom1), float(left1),
+            float(top2), float(right2), float(bottom2), float(left2),
+        )
 
-        # Calculate intersection
-        x_left = max(left1, left2)
-        y_top = max(top1, top2)
-        x_right = min(right1, right2)
-        y_bottom = min(bottom1, bottom2)
 
-        if x_right < x_left or y_bottom < y_top:
-            return 0.0
+class FrameEnhancer:
+    """
+    Enhance entire frames for better person/face detection.
+    - Auto white balance
+    - Contrast enhancement
 
-        intersection = (x_right - x_left) * (y_bottom - y_top)
+    Holds a persistent CLAHE object and reusable LAB/BGR buffers per
+    thread, so a 25 FPS 1080p stream no longer allocates fresh images
+    (and a fresh CLAHE histogram grid) every frame. White balance and
+    CLAHE both run on one LAB image, replacing the old
+    LAB -> BGR -> LAB round trip.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self.use_opencl = bool(cv2.ocl.haveOpenCL())
 
-        # Calculate union
-        box1_area = (right1 - left1) * (bottom1 - top1)
-        box2_area = (right2 - left2) * (bottom2 - top2)
-        union = box1_area + box2_area - intersection
+    def _buffers(self, frame: np.ndarray):
+        local = self._local
+        if getattr(local, 'lab_buf', None) is None or local.lab_buf.shape != frame.shape:
+            local.clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8, 8))
+            local.lab_buf = np.empty_like(frame)
+            local.bgr_buf = np.empty_like(frame)
+        return local
 
-        return intersection / union if union > 0 else 0.0
+    def enhance(self, frame: np.ndarray) -> np.ndarray:
+        if frame is None or frame.size == 0:
+            return frame
+
+        local = self._buffers(frame)
+
+        if self.use_opencl:
+            # T-API path: one upload, all per-pixel work on the OpenCL
+            # device, one download. addWeighted expresses the white
+            # balance (a - L*k) with saturating arithmetic.
+            try:
+                lab = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2LAB)
+                l, a, b = cv2.split(lab)
+                k_a = (cv2.mean(a)[0] - 128) * 0.5 / 255.0
+                k_b = (cv2.mean(b)[0] - 128) * 0.5 / 255.0
+                a = cv2.addWeighted(a, 1.0, l, -k_a, 0)
+                b = cv2.addWeighted(b, 1.0, l, -k_b, 0)
+                l = local.clahe.apply(l)
+                return cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR).get()
+            except cv2.error:
+                self.use_opencl = False  # Driver rejected the chain
+
+        # Auto white balance, done directly in LAB
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB, dst=local.lab_buf)
+        avg_a = cv2.mean(lab[:, :, 1])[0]
+        avg_b = cv2.mean(lab[:, :, 2])[0]
+        lab[:, :, 1] = lab[:, :, 1] - ((avg_a - 128) * (lab[:, :, 0] / 255.0) * 0.5)
+        lab[:, :, 2] = lab[:, :, 2] - ((avg_b - 128) * (lab[:, :, 0] / 255.0) * 0.5)
+
+        # Adaptive contrast on the same LAB image
+        lab[:, :, 0] = local.clahe.apply(lab[:, :, 0])
+
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=local.bgr_buf)
+
+
+_frame_enhancer = FrameEnhancer()
 
 
 def enhance_frame_for_detection(frame: np.ndarray) -> np.ndarray:
+    """Enhance a frame for detection. See :class:`FrameEnhancer`.
+
+    The returned array is a per-thread buffer reused on the next call;
+    copy it if it must outlive the current frame's processing.
     """
-    Enhance entire frame for better person/face detection.
-    - Auto white balance
-    - Contrast enhancement
-    """
-    if frame is None or frame.size == 0:
-        return frame
-
-    # Auto white balance
-    lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-    avg_a = np.average(lab[:, :, 1])
-    avg_b = np.average(lab[:, :, 2])
-    lab[:, :, 1] = lab[:, :, 1] - ((avg_a - 128) * (lab[:, :, 0] / 255.0) * 0.5)
-    lab[:, :, 2] = lab[:, :, 2] - ((avg_b - 128) * (lab[:, :, 0] / 255.0) * 0.5)
-    balanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-
-    # Adaptive contrast
-    clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8, 8))
-    lab = cv2.cvtColor(balanced, cv2.COLOR_BGR2LAB)
-    lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-    enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-
-    return enhanced
+    return _frame_enhancer.enhance(frame)
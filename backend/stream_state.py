@@ -3,13 +3,21 @@ Stream State Manager - Persist and restore active stream state.
 """
 
 import json
+import os
 from pathlib import Path
 from threading import RLock
-from typing import Optional, Dict
+from types import MappingProxyType
+from typing import Mapping, Optional, Dict
 
 
 class StreamStateManager:
-    """Manage persistent stream state across restarts."""
+    """Manage persistent stream state across restarts.
+
+    The in-memory state is an immutable mapping that writers replace
+    wholesale under the lock, so readers can return it without locking
+    or copying. On-disk writes go through a temp file and os.replace so
+    a crash mid-write never leaves a truncated state file behind.
+    """
 
     def __init__(self, state_file: Path):
         self.state_file = Path(state_file)
@@ -17,7 +25,7 @@ class StreamStateManager:
         self._lock = RLock()
 
         # Load existing state
-        self._state = self._load_state()
+        self._state = MappingProxyType(self._load_state())
         print(f"[StreamState] Initialized at {self.state_file}")
         if self._state.get("active"):
             print(f"[StreamState] Found active stream: {self._state.get('source')}")
@@ -35,46 +43,46 @@ class StreamStateManager:
             return {"active": False, "source": None}
 
     def _save_state(self):
-        """Save state to file."""
+        """Save state to file atomically (write temp, then rename)."""
+        tmp = self.state_file.with_suffix(".tmp")
         try:
-            with self.state_file.open("w") as f:
-                json.dump(self._state, f, indent=2)
+            with tmp.open("w") as f:
+                json.dump(dict(self._state), f, indent=2)
+            os.replace(tmp, self.state_file)
         except Exception as e:
             print(f"[StreamState] Error saving state: {e}")
 
     def set_active(self, source: str, source_type: str = "unknown"):
         """Mark stream as active."""
         with self._lock:
-            self._state = {
+            self._state = MappingProxyType({
                 "active": True,
                 "source": source,
                 "source_type": source_type
-            }
+            })
             self._save_state()
             print(f"[StreamState] Stream activated: {source}")
 
     def set_inactive(self):
         """Mark stream as inactive."""
         with self._lock:
-            self._state = {
+            self._state = MappingProxyType({
                 "active": False,
                 "source": self._state.get("source"),
                 "source_type": self._state.get("source_type")
-            }
+            })
             self._save_state()
             print(f"[StreamState] Stream deactivated")
 
     def is_active(self) -> bool:
         """Check if stream should be active."""
-        with self._lock:
-            return self._state.get("active", False)
+        # Reference read of an immutable mapping; no lock needed
+        return self._state.get("active", False)
 
     def get_source(self) -> Optional[str]:
         """Get the active source."""
-        with self._lock:
-            return self._state.get("source")
+        return self._state.get("source")
 
-    def get_state(self) -> Dict:
-        """Get full state."""
-        with self._lock:
-            return self._state.copy()
+    def get_state(self) -> Mapping:
+        """Get full state (read-only view; never mutated in place)."""
+        return self._state
